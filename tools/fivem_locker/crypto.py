@@ -1,17 +1,62 @@
 from __future__ import annotations
 
+import functools
+import hashlib
 import os
 from dataclasses import dataclass
 
+try:
+    from cryptography.hazmat.backends import default_backend
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+except ImportError:  # pragma: no cover - cryptography is optional on PyPy
+    Cipher = None
 
-def _fnv1a32(data: bytes) -> int:
-    seed = 0x811C9DC5
+try:
+    import numpy as _np
+except ImportError:  # pragma: no cover - numpy is optional
+    _np = None
+
+try:
+    from numba import njit as _njit
+except ImportError:  # pragma: no cover - numba is optional
+    _njit = None
+
+
+def _xor_bytes(a: bytes, b: bytes) -> bytes:
+    # Hot path for multi-MB bundles: numpy XORs the whole stream in C instead
+    # of one Python int op per byte.
+    if _np is not None:
+        return _np.bitwise_xor(
+            _np.frombuffer(a, dtype=_np.uint8),
+            _np.frombuffer(b, dtype=_np.uint8),
+        ).tobytes()
+    # Pure-Python fallback: XOR 8 bytes at a time through CPython's C-level
+    # big-int ops instead of one Python int op per byte.
+    n = len(a)
+    m = n & ~7
+    out = bytearray(n)
+    for i in range(0, m, 8):
+        v = int.from_bytes(a[i:i + 8], "little") ^ int.from_bytes(b[i:i + 8], "little")
+        out[i:i + 8] = v.to_bytes(8, "little")
+    for i in range(m, n):
+        out[i] = a[i] ^ b[i]
+    return bytes(out)
+
+
+def _fnv1a32(data: bytes, seed: int = 0x811C9DC5) -> int:
     for b in data:
         seed ^= b
         seed = (seed * 0x01000193) & 0xFFFFFFFF
     return seed
 
 
+@functools.lru_cache(maxsize=16)
+def _fnv_prefix(material: bytes) -> int:
+    # FNV-1a is a running fold, so the state after the fixed license|salt
+    # prefix can be cached and only the per-call nonce folded on top.
+    return _fnv1a32(material)
+
+
 def _xorshift32(seed: int) -> int:
     x = seed & 0xFFFFFFFF
     x ^= (x << 13) & 0xFFFFFFFF
@@ -20,7 +65,44 @@ def _xorshift32(seed: int) -> int:
     return x & 0xFFFFFFFF
 
 
+if _njit is not None and _np is not None:
+
+    @_njit(cache=True)
+    def _keystream_native(seed, length):  # pragma: no cover - compiled
+        out = _np.empty(length, dtype=_np.uint8)
+        x = seed & 0xFFFFFFFF
+        for i in range(length):
+            x ^= (x << 13) & 0xFFFFFFFF
+            x ^= x >> 17
+            x ^= (x << 5) & 0xFFFFFFFF
+            out[i] = x & 0xFF
+        return out
+
+    @_njit(cache=True)
+    def _xor_stream_native(data, seed):  # pragma: no cover - compiled
+        # Fused keystream + XOR: no len(data)-byte keystream buffer, one read
+        # of the plaintext and one write of the ciphertext.
+        n = data.shape[0]
+        out = _np.empty(n, dtype=_np.uint8)
+        x = seed & 0xFFFFFFFF
+        for i in range(n):
+            x ^= (x << 13) & 0xFFFFFFFF
+            x ^= x >> 17
+            x ^= (x << 5) & 0xFFFFFFFF
+            out[i] = (x & 0xFF) ^ data[i]
+        return out
+
+else:
+    _keystream_native = None
+    _xor_stream_native = None
+
+
 def _keystream(seed: int, length: int) -> bytes:
+    # xorshift32 is sequential, so the only way to get rid of the per-byte
+    # interpreter loop is to compile it; numba turns this into the same tight
+    # native loop a C implementation would be.
+    if _keystream_native is not None:
+        return _keystream_native(seed, length).tobytes()
     out = bytearray(length)
     x = seed
     for i in range(length):
@@ -35,16 +117,32 @@ class LockerCrypto:
     salt: str
 
     def _derive_seed32(self, nonce: bytes) -> int:
-        material = (self.license_key + "|" + self.salt).encode("utf-8") + nonce
-        return _fnv1a32(material)
+        prefix = _fnv_prefix((self.license_key + "|" + self.salt).encode("utf-8"))
+        return _fnv1a32(nonce, prefix)
+
+    def _derive_key32(self) -> bytes:
+        return hashlib.sha256((self.license_key + "|" + self.salt).encode("utf-8")).digest()
 
-    def encrypt(self, data: bytes) -> bytes:
-        # Simple XOR stream using xorshift32 seeded by FNV-1a over (license|salt|nonce)
+    def encrypt(self, data: bytes | bytearray) -> bytes:
+        # AES-256-CTR via OpenSSL (AES-NI) keyed by SHA-256(license|salt).
+        # Tag: AES1
+        if Cipher is not None:
+            nonce = os.urandom(16)
+            enc = Cipher(
+                algorithms.AES(self._derive_key32()),
+                modes.CTR(nonce),
+                backend=default_backend(),
+            ).encryptor()
+            return b"AES1" + nonce + enc.update(data) + enc.finalize()
+        # Fallback: XOR stream using xorshift32 seeded by FNV-1a over (license|salt|nonce)
         # Tag: XRF\x00 (XOR Fallback)
         nonce = os.urandom(12)
         seed = self._derive_seed32(nonce)
-        ks = _keystream(seed, len(data))
-        out = bytes(a ^ b for a, b in zip(data, ks))
+        if _xor_stream_native is not None:
+            out = _xor_stream_native(_np.frombuffer(data, dtype=_np.uint8), seed).tobytes()
+        else:
+            ks = _keystream(seed, len(data))
+            out = _xor_bytes(data, ks)
         return b"XRF\x00" + nonce + out
 
     def decrypt(self, data: bytes) -> bytes:
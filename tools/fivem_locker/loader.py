@@ -1,13 +1,16 @@
 from __future__ import annotations
 
 from textwrap import dedent
-from string import Template
 
 
-def generate_loader(blob_filename: str, role: str, license_key_hint: str | None = None, salt: str = "fivem-locker") -> str:
-    lua = """
+# NOTE: raw string -- escapes like \n and \0 must reach the Lua source as
+# escape sequences, not as literal bytes inside Lua string literals.
+_LOADER_LUA = r"""
     local role = '$role'
 
+    local band, bor, bxor, bnot = bit.band, bit.bor, bit.bxor, bit.bnot
+    local lshift, rshift = bit.lshift, bit.rshift
+
     local function read_blob(path)
       local f = assert(io.open(path, 'rb'))
       local d = f:read('*a')
@@ -26,37 +29,216 @@ def generate_loader(blob_filename: str, role: str, license_key_hint: str | None
       return k
     end
 
-    local function split_tag(data)
-      return string.sub(data,1,4), string.sub(data,5,16), string.sub(data,17)
+    -- SHA-256 (FIPS 180-4), used to derive the AES key from license|salt.
+    local SHA_K = {
+      0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b, 0x59f111f1, 0x923f82a4, 0xab1c5ed5,
+      0xd807aa98, 0x12835b01, 0x243185be, 0x550c7dc3, 0x72be5d74, 0x80deb1fe, 0x9bdc06a7, 0xc19bf174,
+      0xe49b69c1, 0xefbe4786, 0x0fc19dc6, 0x240ca1cc, 0x2de92c6f, 0x4a7484aa, 0x5cb0a9dc, 0x76f988da,
+      0x983e5152, 0xa831c66d, 0xb00327c8, 0xbf597fc7, 0xc6e00bf3, 0xd5a79147, 0x06ca6351, 0x14292967,
+      0x27b70a85, 0x2e1b2138, 0x4d2c6dfc, 0x53380d13, 0x650a7354, 0x766a0abb, 0x81c2c92e, 0x92722c85,
+      0xa2bfe8a1, 0xa81a664b, 0xc24b8b70, 0xc76c51a3, 0xd192e819, 0xd6990624, 0xf40e3585, 0x106aa070,
+      0x19a4c116, 0x1e376c08, 0x2748774c, 0x34b0bcb5, 0x391c0cb3, 0x4ed8aa4a, 0x5b9cca4f, 0x682e6ff3,
+      0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208, 0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2
+    }
+
+    local function rrot(x, n)
+      return band(bor(rshift(x, n), lshift(x, 32 - n)), 0xffffffff)
+    end
+
+    local function sha256(msg)
+      local h0, h1, h2, h3 = 0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a
+      local h4, h5, h6, h7 = 0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19
+      local bitlen = #msg * 8
+      msg = msg .. '\128' .. string.rep('\0', (55 - #msg) % 64)
+          .. string.char(0, 0, 0, 0,
+                         band(rshift(bitlen, 24), 0xff), band(rshift(bitlen, 16), 0xff),
+                         band(rshift(bitlen, 8), 0xff), band(bitlen, 0xff))
+      local w = {}
+      for chunk = 1, #msg, 64 do
+        for i = 0, 15 do
+          local o = chunk + i * 4
+          local b0, b1, b2, b3 = string.byte(msg, o, o + 3)
+          w[i + 1] = b0 * 16777216 + b1 * 65536 + b2 * 256 + b3
+        end
+        for i = 17, 64 do
+          local x = w[i - 15]
+          local s0 = bxor(bxor(rrot(x, 7), rrot(x, 18)), rshift(x, 3))
+          local y = w[i - 2]
+          local s1 = bxor(bxor(rrot(y, 17), rrot(y, 19)), rshift(y, 10))
+          w[i] = band(w[i - 16] + s0 + w[i - 7] + s1, 0xffffffff)
+        end
+        local a, b, c, d, e, f, g, h = h0, h1, h2, h3, h4, h5, h6, h7
+        for i = 1, 64 do
+          local S1 = bxor(bxor(rrot(e, 6), rrot(e, 11)), rrot(e, 25))
+          local ch = bxor(band(e, f), band(bnot(e), g))
+          local t1 = band(h + S1 + ch + SHA_K[i] + w[i], 0xffffffff)
+          local S0 = bxor(bxor(rrot(a, 2), rrot(a, 13)), rrot(a, 22))
+          local maj = bxor(bxor(band(a, b), band(a, c)), band(b, c))
+          local t2 = band(S0 + maj, 0xffffffff)
+          h = g; g = f; f = e; e = band(d + t1, 0xffffffff)
+          d = c; c = b; b = a; a = band(t1 + t2, 0xffffffff)
+        end
+        h0 = band(h0 + a, 0xffffffff); h1 = band(h1 + b, 0xffffffff)
+        h2 = band(h2 + c, 0xffffffff); h3 = band(h3 + d, 0xffffffff)
+        h4 = band(h4 + e, 0xffffffff); h5 = band(h5 + f, 0xffffffff)
+        h6 = band(h6 + g, 0xffffffff); h7 = band(h7 + h, 0xffffffff)
+      end
+      local out = {}
+      for _, v in ipairs({ h0, h1, h2, h3, h4, h5, h6, h7 }) do
+        out[#out + 1] = string.char(band(rshift(v, 24), 0xff), band(rshift(v, 16), 0xff),
+                                    band(rshift(v, 8), 0xff), band(v, 0xff))
+      end
+      return table.concat(out)
+    end
+
+    -- AES-256 in CTR mode (matches cryptography's AES/CTR on the packer side).
+    local AES_SBOX = {
+      99,124,119,123,242,107,111,197,48,1,103,43,254,215,171,118,
+      202,130,201,125,250,89,71,240,173,212,162,175,156,164,114,192,
+      183,253,147,38,54,63,247,204,52,165,229,241,113,216,49,21,
+      4,199,35,195,24,150,5,154,7,18,128,226,235,39,178,117,
+      9,131,44,26,27,110,90,160,82,59,214,179,41,227,47,132,
+      83,209,0,237,32,252,177,91,106,203,190,57,74,76,88,207,
+      208,239,170,251,67,77,51,133,69,249,2,127,80,60,159,168,
+      81,163,64,143,146,157,56,245,188,182,218,33,16,255,243,210,
+      205,12,19,236,95,151,68,23,196,167,126,61,100,93,25,115,
+      96,129,79,220,34,42,144,136,70,238,184,20,222,94,11,219,
+      224,50,58,10,73,6,36,92,194,211,172,98,145,149,228,121,
+      231,200,55,109,141,213,78,169,108,86,244,234,101,122,174,8,
+      186,120,37,46,28,166,180,198,232,221,116,31,75,189,139,138,
+      112,62,181,102,72,3,246,14,97,53,87,185,134,193,29,158,
+      225,248,152,17,105,217,142,148,155,30,135,233,206,85,40,223,
+      140,161,137,13,191,230,66,104,65,153,45,15,176,84,187,22
+    }
+
+    local function aes_expand_key(key)
+      local w = {}
+      for i = 0, 7 do
+        local o = i * 4 + 1
+        local b0, b1, b2, b3 = string.byte(key, o, o + 3)
+        w[i] = b0 * 16777216 + b1 * 65536 + b2 * 256 + b3
+      end
+      local rcon = 1
+      for i = 8, 59 do
+        local t = w[i - 1]
+        if i % 8 == 0 then
+          t = AES_SBOX[band(rshift(t, 16), 0xff) + 1] * 16777216
+              + AES_SBOX[band(rshift(t, 8), 0xff) + 1] * 65536
+              + AES_SBOX[band(t, 0xff) + 1] * 256
+              + AES_SBOX[band(rshift(t, 24), 0xff) + 1]
+          t = bxor(t, rcon * 16777216)
+          rcon = rcon * 2
+        elseif i % 8 == 4 then
+          t = AES_SBOX[band(rshift(t, 24), 0xff) + 1] * 16777216
+              + AES_SBOX[band(rshift(t, 16), 0xff) + 1] * 65536
+              + AES_SBOX[band(rshift(t, 8), 0xff) + 1] * 256
+              + AES_SBOX[band(t, 0xff) + 1]
+        end
+        w[i] = bxor(w[i - 8], t)
+      end
+      return w
+    end
+
+    local function xtime(a)
+      a = a * 2
+      if a >= 256 then a = bxor(a - 256, 0x1b) end
+      return a
+    end
+
+    local function aes_encrypt_block(w, input)
+      local s = {}
+      for i = 1, 16 do s[i] = input[i] end
+      local function add_round_key(round)
+        for c = 0, 3 do
+          local word = w[round * 4 + c]
+          local o = c * 4
+          s[o + 1] = bxor(s[o + 1], band(rshift(word, 24), 0xff))
+          s[o + 2] = bxor(s[o + 2], band(rshift(word, 16), 0xff))
+          s[o + 3] = bxor(s[o + 3], band(rshift(word, 8), 0xff))
+          s[o + 4] = bxor(s[o + 4], band(word, 0xff))
+        end
+      end
+      add_round_key(0)
+      for round = 1, 14 do
+        for i = 1, 16 do s[i] = AES_SBOX[s[i] + 1] end
+        -- ShiftRows (state is column-major: s[row + 4*col + 1])
+        s[2], s[6], s[10], s[14] = s[6], s[10], s[14], s[2]
+        s[3], s[11] = s[11], s[3]
+        s[7], s[15] = s[15], s[7]
+        s[4], s[8], s[12], s[16] = s[16], s[4], s[8], s[12]
+        if round < 14 then
+          for c = 0, 3 do
+            local o = c * 4
+            local a0, a1, a2, a3 = s[o + 1], s[o + 2], s[o + 3], s[o + 4]
+            local t = bxor(bxor(a0, a1), bxor(a2, a3))
+            s[o + 1] = bxor(a0, bxor(t, xtime(bxor(a0, a1))))
+            s[o + 2] = bxor(a1, bxor(t, xtime(bxor(a1, a2))))
+            s[o + 3] = bxor(a2, bxor(t, xtime(bxor(a2, a3))))
+            s[o + 4] = bxor(a3, bxor(t, xtime(bxor(a3, a0))))
+          end
+        end
+        add_round_key(round)
+      end
+      return s
+    end
+
+    local function aes256_ctr(key, nonce, data)
+      local w = aes_expand_key(key)
+      local ctr = { string.byte(nonce, 1, 16) }
+      local out = {}
+      local n = #data
+      local pos = 1
+      while pos <= n do
+        local ks = aes_encrypt_block(w, ctr)
+        local blocklen = 16
+        if n - pos + 1 < 16 then blocklen = n - pos + 1 end
+        local chars = {}
+        for i = 1, blocklen do
+          chars[i] = string.char(bxor(string.byte(data, pos + i - 1), ks[i]))
+        end
+        out[#out + 1] = table.concat(chars)
+        pos = pos + blocklen
+        for i = 16, 1, -1 do
+          if ctr[i] == 255 then ctr[i] = 0 else ctr[i] = ctr[i] + 1; break end
+        end
+      end
+      return table.concat(out)
     end
 
     local function decrypt(data)
-      local tag, nonce, rest = split_tag(data)
+      local tag = string.sub(data, 1, 4)
       local lic = get_license()
       local salt = '$salt'
-      if tag == 'XRF\0' then
+      if tag == 'AES1' then
+        local nonce = string.sub(data, 5, 20)
+        local body = string.sub(data, 21)
+        local key = sha256(lic .. '|' .. salt)
+        return aes256_ctr(key, nonce, body)
+      elseif tag == 'XRF\0' then
+        local nonce = string.sub(data, 5, 16)
+        local rest = string.sub(data, 17)
         local seed = 2166136261
         local function fnv1a32_step(c)
-          seed = bit.bxor(seed, c) & 0xffffffff
-          seed = (seed * 16777619) & 0xffffffff
+          seed = band(bxor(seed, c), 0xffffffff)
+          seed = band(seed * 16777619, 0xffffffff)
         end
         local mix = lic .. '|' .. salt .. nonce
-        for i=1,#mix do
+        for i = 1, #mix do
           fnv1a32_step(string.byte(mix, i))
         end
         local function xorshift32(x)
-          x = bit.bxor(x, bit.lshift(x, 13))
-          x = bit.bxor(x, bit.rshift(x, 17))
-          x = bit.bxor(x, bit.lshift(x, 5))
-          return x & 0xffffffff
+          x = bxor(x, band(lshift(x, 13), 0xffffffff))
+          x = bxor(x, rshift(x, 17))
+          x = bxor(x, band(lshift(x, 5), 0xffffffff))
+          return band(x, 0xffffffff)
         end
         local out = {}
         local x = seed
-        for i=1,#rest do
+        for i = 1, #rest do
           x = xorshift32(x)
-          local b = bit.band(x, 0xff)
+          local b = band(x, 0xff)
           local rb = string.byte(rest, i)
-          out[i] = string.char(bit.bxor(rb, b))
+          out[i] = string.char(bxor(rb, b))
         end
         return table.concat(out)
       else
@@ -110,4 +292,20 @@ def generate_loader(blob_filename: str, role: str, license_key_hint: str | None
 
     main()
     """
-    return dedent(Template(lua).substitute(role=role, blob_filename=blob_filename, salt=salt)).strip() + "\n"
\ No newline at end of file
+
+# Split the dedented template on its three placeholders once at import;
+# rendering is then a plain join with no per-call template scan. Each
+# placeholder occurs exactly once, in this order.
+def _split_parts(template: str) -> tuple[str, str, str, str]:
+    head, rest = template.split("$role", 1)
+    pre_salt, rest = rest.split("$salt", 1)
+    pre_blob, tail = rest.split("$blob_filename", 1)
+    return head, pre_salt, pre_blob, tail
+
+
+_LOADER_PARTS = _split_parts(dedent(_LOADER_LUA))
+
+
+def generate_loader(blob_filename: str, role: str, license_key_hint: str | None = None, salt: str = "fivem-locker") -> str:
+    head, pre_salt, pre_blob, tail = _LOADER_PARTS
+    return "".join((head, role, pre_salt, salt, pre_blob, blob_filename, tail)).strip() + "\n"
@@ -1,35 +1,97 @@
+import hashlib
+import os
 import re
+from pathlib import Path
 
-_COMMENT = re.compile(r"--\[(=*)\[[\s\S]*?\]\1\]|--.*?$", re.M)
-_WS = re.compile(r"\s+")
+# Single-pass scanner: every construct the old multi-pass pipeline handled
+# (long/short comments, long/short strings, keywords, whitespace, operators)
+# is one alternative, so the source is traversed exactly once. Alternative
+# order matters: comments before strings before operators.
+_TOKEN = re.compile(
+    r"(?P<lcomment>--\[(?P<ceq>=*)\[[\s\S]*?\](?P=ceq)\])"
+    r"|(?P<comment>--[^\n]*)"
+    r"|(?P<lstring>\[(?P<seq>=*)\[[\s\S]*?\](?P=seq)\])"
+    r"|(?P<string>\"(?:\\[\s\S]|[^\\\n\"])*\"|\'(?:\\[\s\S]|[^\\\n\'])*\')"
+    r"|(?P<keyword>\b(?:end|then|else|elseif|function|local|return|do|repeat|until)\b)"
+    r"|(?P<ws>\s+)"
+    r"|(?P<op>[=+\-*/%#<>~:,;(){}\[\]])"
+    r"|(?P<word>[^\s=+\-*/%#<>~:,;(){}\[\]\'\"]+)"
+    # catch-all: anything the alternatives above reject (e.g. an unterminated
+    # quote) passes through verbatim rather than being dropped
+    r"|(?P<other>[\s\S])"
+)
 
 # Basic safe minifier: strips comments and excessive whitespace without altering strings
 
 def minify_lua(source: str) -> str:
-    # Protect strings
-    placeholders: list[str] = []
+    parts: list[str] = []
+    pending_sep = False  # a separator is owed before the next word-like token
+    after_op = False  # separators adjacent to operators are dropped
 
-    def _protect(match: re.Match[str]) -> str:
-        placeholders.append(match.group(0))
-        return f"__STR{len(placeholders)-1}__"
+    for m in _TOKEN.finditer(source):
+        kind = m.lastgroup
+        if kind in ("lcomment", "comment"):
+            continue
+        if kind == "ws":
+            if parts and not after_op:
+                pending_sep = True
+            continue
+        if kind == "op":
+            parts.append(m.group())
+            pending_sep = False
+            after_op = True
+            continue
+        # word, string, lstring, keyword, other
+        if pending_sep:
+            parts.append(" ")
+        parts.append(m.group())
+        pending_sep = kind == "keyword"  # keep keywords separated even when
+        # the following token abuts them
+        after_op = False
 
-    source = re.sub(r"(?s)\[(=*)\[[\s\S]*?\]\1\]", _protect, source)  # long strings
-    source = re.sub(r"(?s)\"(?:\\.|[^\\\n\"])*\"|\'(?:\\.|[^\\\n\'])*\'", _protect, source)
+    return "".join(parts)
 
-    # Remove comments
-    source = _COMMENT.sub("", source)
 
-    # Collapse whitespace around tokens conservatively
-    # Keep newlines around end/then/else/function/local/return for safety
-    tokens_keep_nl = r"\b(end|then|else|elseif|function|local|return|do|repeat|until)\b"
-    source = re.sub(tokens_keep_nl, r"\n\1\n", source)
-    source = _WS.sub(" ", source)
-    source = re.sub(r"\s*([=+\-*/%#<>~:,;(){}\[\]])\s*", r"\1", source)
+# On-disk cache for repeat packs of unchanged files. Version is part of the
+# key so changing the minifier invalidates old entries.
+_MINIFIER_VERSION = b"2|"
+_CACHE_MAX_ENTRIES = 4096
 
-    # Restore strings
-    for i, s in enumerate(placeholders):
-        source = source.replace(f"__STR{i}__", s)
 
-    # Final tidy
-    source = re.sub(r"\n+", "\n", source).strip()
-    return source
+def _cache_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "fivem-locker" / "minify"
+
+
+def _trim_cache(cache_dir: Path) -> None:
+    entries = list(os.scandir(cache_dir))
+    if len(entries) <= _CACHE_MAX_ENTRIES:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime)
+    for e in entries[: len(entries) - _CACHE_MAX_ENTRIES]:
+        try:
+            os.unlink(e.path)
+        except OSError:
+            pass
+
+
+def minify_lua_cached(source: str) -> str:
+    """minify_lua with a best-effort on-disk cache keyed by content hash."""
+    key = hashlib.blake2b(_MINIFIER_VERSION + source.encode("utf-8"), digest_size=16).hexdigest()
+    path = _cache_dir() / key
+    try:
+        out = path.read_text(encoding="utf-8")
+        os.utime(path)  # keep hot entries out of the LRU trim
+        return out
+    except OSError:
+        pass
+    out = minify_lua(source)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{key}.{os.getpid()}.tmp")
+        tmp.write_text(out, encoding="utf-8")
+        tmp.replace(path)
+        _trim_cache(path.parent)
+    except OSError:
+        pass  # caching must never fail a pack
+    return out
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass, field
 from pathlib import Path
 
@@ -20,6 +21,25 @@ class ManifestData:
     game: list[str] | None = None
 
 
+# All manifest patterns are compiled once at import; read_manifest may be
+# called for many resources in one run.
+_BLOCK_PATTERNS = {
+    kw: re.compile(re.escape(kw) + r"\s*\{([^\}]*)\}", re.S)
+    for kw in ("files", "client_scripts", "server_scripts", "shared_scripts")
+}
+_SINGLE_PATTERNS = {
+    kw: re.compile(re.escape(kw) + r"\s+(['\"])(.+?)\1")
+    for kw in ("client_script", "server_script", "shared_script")
+}
+_RE_UI_PAGE = re.compile(r"ui_page\s+['\"](.*?)['\"]")
+_RE_FX_VERSION = re.compile(r"fx_version\s+['\"](.*?)['\"]")
+_RE_GAME = re.compile(r"game\s*\{([^\}]*)\}", re.S)
+_RE_NAME = re.compile(r"(?m)^\s*name\s+['\"](.*?)['\"]")
+_RE_VERSION = re.compile(r"(?m)^\s*version\s+['\"](.*?)['\"]")
+_RE_DESCRIPTION = re.compile(r"(?m)^\s*description\s+['\"](.*?)['\"]")
+_RE_AUTHOR = re.compile(r"(?m)^\s*author\s+['\"](.*?)['\"]")
+
+
 def read_manifest(root: Path) -> ManifestData:
     mf = root / "fxmanifest.lua"
     if not mf.exists():
@@ -30,11 +50,8 @@ def read_manifest(root: Path) -> ManifestData:
     text = mf.read_text(encoding="utf-8", errors="ignore")
     data = ManifestData()
 
-    import re
-
     def _extract_block_list(keyword: str) -> list[str]:
-        pattern = re.compile(re.escape(keyword) + r"\s*\{([^\}]*)\}", re.S)
-        m = pattern.search(text)
+        m = _BLOCK_PATTERNS[keyword].search(text)
         if not m:
             return []
         body = m.group(1)
@@ -48,23 +65,22 @@ def read_manifest(root: Path) -> ManifestData:
         return items
 
     def _extract_single_lines(keyword: str) -> list[str]:
-        pattern = re.compile(re.escape(keyword) + r"\s+(['\"])(.+?)\1")
-        return [m.group(2) for m in pattern.finditer(text)]
+        return [m.group(2) for m in _SINGLE_PATTERNS[keyword].finditer(text)]
 
     data.files = _extract_block_list("files")
     data.client_scripts = _extract_block_list("client_scripts") or _extract_single_lines("client_script")
     data.server_scripts = _extract_block_list("server_scripts") or _extract_single_lines("server_script")
     data.shared_scripts = _extract_block_list("shared_scripts") or _extract_single_lines("shared_script")
 
-    m = re.search(r"ui_page\s+['\"](.*?)['\"]", text)
+    m = _RE_UI_PAGE.search(text)
     if m:
         data.ui_page = m.group(1)
 
-    m = re.search(r"fx_version\s+['\"](.*?)['\"]", text)
+    m = _RE_FX_VERSION.search(text)
     if m:
         data.fx_version = m.group(1)
 
-    games = re.findall(r"game\s*\{([^\}]*)\}", text, re.S)
+    games = _RE_GAME.findall(text)
     if games:
         g_list: list[str] = []
         for part in games[0].split(','):
@@ -73,16 +89,16 @@ def read_manifest(root: Path) -> ManifestData:
                 g_list.append(p)
         data.game = g_list or None
 
-    m = re.search(r"(?m)^\s*name\s+['\"](.*?)['\"]", text)
+    m = _RE_NAME.search(text)
     if m:
         data.name = m.group(1)
-    m = re.search(r"(?m)^\s*version\s+['\"](.*?)['\"]", text)
+    m = _RE_VERSION.search(text)
     if m:
         data.version = m.group(1)
-    m = re.search(r"(?m)^\s*description\s+['\"](.*?)['\"]", text)
+    m = _RE_DESCRIPTION.search(text)
     if m:
         data.description = m.group(1)
-    m = re.search(r"(?m)^\s*author\s+['\"](.*?)['\"]", text)
+    m = _RE_AUTHOR.search(text)
     if m:
         data.author = m.group(1)
 